@@ -1,4 +1,5 @@
 import hashlib
+from collections.abc import AsyncIterator
 from datetime import datetime, timezone
 from http import HTTPStatus
 from io import BytesIO
@@ -71,6 +72,13 @@ async def upload_file(
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
+async def _prepend_chunk(first_chunk: bytes, stream: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    if first_chunk:
+        yield first_chunk
+    async for chunk in stream:
+        yield chunk
+
+
 @router.get("/download/{flow_id}/{file_name}")
 async def download_file(
     file_name: str, flow_id: UUID, storage_service: Annotated[StorageService, Depends(get_storage_service)]
@@ -89,13 +97,15 @@ async def download_file(
         raise HTTPException(status_code=500, detail=f"Content type not found for extension {extension}")
 
     try:
-        file_content = await storage_service.get_file(flow_id=flow_id_str, file_name=file_name)
         headers = {
             "Content-Disposition": f"attachment; filename={file_name} filename*=UTF-8''{file_name}",
             "Content-Type": "application/octet-stream",
-            "Content-Length": str(len(file_content)),
         }
-        return StreamingResponse(BytesIO(file_content), media_type=content_type, headers=headers)
+        # Open the file and read its first chunk before sending the headers, so a missing file
+        # or storage error still turns into an error response instead of a broken download
+        file_stream = storage_service.get_file_stream(flow_id=flow_id_str, file_name=file_name)
+        first_chunk = await anext(file_stream, b"")
+        return StreamingResponse(_prepend_chunk(first_chunk, file_stream), media_type=content_type, headers=headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
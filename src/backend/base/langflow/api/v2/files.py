@@ -278,8 +278,8 @@ async def delete_files_batch(
             raise HTTPException(status_code=404, detail="No files found")
 
         # Delete all files from the storage service
+        await storage_service.delete_files(flow_id=str(current_user.id), file_names=[file.path for file in files])
         for file in files:
-            await storage_service.delete_file(flow_id=str(current_user.id), file_name=file.path)
             await session.delete(file)
 
         # Delete all files from the database
@@ -314,6 +314,7 @@ async def download_files_batch(
 
         # Create a ZIP file
         with zipfile.ZipFile(zip_stream, "w") as zip_file:
+            # Read one file at a time so only a single file's content is held besides the archive
             for file in files:
                 # Get the file content from storage
                 file_content = await storage_service.get_file(
@@ -508,8 +509,8 @@ async def delete_all_files(
         files = results.all()
 
         # Delete all files from the storage service
+        await storage_service.delete_files(flow_id=str(current_user.id), file_names=[file.path for file in files])
         for file in files:
-            await storage_service.delete_file(flow_id=str(current_user.id), file_name=file.path)
             await session.delete(file)
 
         # Delete all files from the database
@@ -26,3 +26,6 @@ EXTENSION_TO_CONTENT_TYPE = {
     "yaml": "application/x-yaml",
     "yml": "application/x-yaml",
 }
+
+# Text-based formats that are worth compressing before they are uploaded to remote storage
+COMPRESSIBLE_EXTENSIONS = frozenset({"json", "txt", "csv", "html", "svg", "xml", "yaml", "yml", "md", "log"})
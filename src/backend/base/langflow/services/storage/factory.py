@@ -24,7 +24,7 @@ class StorageServiceFactory(ServiceFactory):
             from .s3 import S3StorageService
 
             return S3StorageService(session_service, settings_service)
-        logger.warning(f"Storage type {storage_type} not supported. Using local storage.")
+        logger.warning("Storage type %s not supported. Using local storage.", storage_type)
         from .local import LocalStorageService
 
         return LocalStorageService(session_service, settings_service)
@@ -1,8 +1,67 @@
-import anyio
-from aiofile import async_open
+from __future__ import annotations
+
+import asyncio
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
+
 from lfx.log.logger import logger
 
-from .service import StorageService
+from .service import STREAM_CHUNK_SIZE, StorageService
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterable, AsyncIterator
+
+
+# O_CLOEXEC is POSIX-only and O_BINARY Windows-only; each is 0 where it does not apply
+_WRITE_FLAGS = os.O_CREAT | os.O_WRONLY | os.O_TRUNC | getattr(os, "O_CLOEXEC", 0) | getattr(os, "O_BINARY", 0)
+
+
+def _write_bytes(path: str, data: bytes) -> None:
+    # Write with raw syscalls; small payloads go out in a single os.write without any Python-level buffering
+    fd = os.open(path, _WRITE_FLAGS, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view) :]
+    finally:
+        os.close(fd)
+
+
+def _read_bytes(path: str) -> bytes:
+    with Path(path).open("rb") as f:
+        return f.read()
+
+
+def _list_file_names(path: str) -> list[str]:
+    with os.scandir(path) as entries:
+        return [entry.name for entry in entries if entry.is_file()]
+
+
+def _send_file(path: str, out_fd: int) -> int:
+    with Path(path).open("rb") as f:
+        if not hasattr(os, "sendfile"):
+            # os.sendfile is not available on Windows, so copy through a buffer instead
+            return _copy_to_fd(f, out_fd)
+        size = os.fstat(f.fileno()).st_size
+        sent = 0
+        while sent < size:
+            count = os.sendfile(out_fd, f.fileno(), sent, size - sent)
+            if count == 0:
+                break
+            sent += count
+        return sent
+
+
+def _copy_to_fd(f: BinaryIO, out_fd: int) -> int:
+    sent = 0
+    while chunk := f.read(STREAM_CHUNK_SIZE):
+        view = memoryview(chunk)
+        while view:
+            written = os.write(out_fd, view)
+            view = view[written:]
+        sent += len(chunk)
+    return sent
 
 
 class LocalStorageService(StorageService):
@@ -11,12 +70,21 @@ class LocalStorageService(StorageService):
     def __init__(self, session_service, settings_service) -> None:
         """Initialize the local storage service with session and settings services."""
         super().__init__(session_service, settings_service)
+        # Flow folders already created by this service, so save_file can skip mkdir
+        self._created_folders: set[str] = set()
         self.set_ready()
 
     def build_full_path(self, flow_id: str, file_name: str) -> str:
         """Build the full path of a file in the local storage."""
         return str(self.data_dir / flow_id / file_name)
 
+    async def _ensure_folder(self, flow_id: str) -> Path:
+        folder_path = self.data_dir / flow_id
+        if flow_id not in self._created_folders:
+            await asyncio.to_thread(folder_path.mkdir, parents=True, exist_ok=True)
+            self._created_folders.add(flow_id)
+        return folder_path
+
     async def save_file(self, flow_id: str, file_name: str, data: bytes) -> None:
         """Save a file in the local storage.
 
@@ -30,17 +98,22 @@ class LocalStorageService(StorageService):
             IsADirectoryError: If the file name is a directory.
             PermissionError: If there is no permission to write the file.
         """
-        folder_path = self.data_dir / flow_id
-        await folder_path.mkdir(parents=True, exist_ok=True)
+        folder_path = await self._ensure_folder(flow_id)
         file_path = folder_path / file_name
 
         try:
-            async with async_open(str(file_path), "wb") as f:
-                await f.write(data)
-            await logger.ainfo(f"File {file_name} saved successfully in flow {flow_id}.")
+            try:
+                await asyncio.to_thread(_write_bytes, str(file_path), data)
+            except FileNotFoundError:
+                # The cached folder may have been removed since (e.g. by the orphaned flow cleanup)
+                await asyncio.to_thread(folder_path.mkdir, parents=True, exist_ok=True)
+                await asyncio.to_thread(_write_bytes, str(file_path), data)
+            await logger.ainfo("File %s saved successfully in flow %s.", file_name, flow_id)
         except Exception:
-            logger.exception(f"Error saving file {file_name} in flow {flow_id}")
+            logger.exception("Error saving file %s in flow %s", file_name, flow_id)
             raise
+        finally:
+            self._invalidate_file_size(flow_id, file_name)
 
     async def get_file(self, flow_id: str, file_name: str) -> bytes:
         """Retrieve a file from the local storage.
@@ -56,17 +129,103 @@ class LocalStorageService(StorageService):
             FileNotFoundError: If the file does not exist.
         """
         file_path = self.data_dir / flow_id / file_name
-        if not await file_path.exists():
-            await logger.awarning(f"File {file_name} not found in flow {flow_id}.")
+        try:
+            content = await asyncio.to_thread(_read_bytes, str(file_path))
+        except FileNotFoundError as e:
+            await logger.awarning("File %s not found in flow %s.", file_name, flow_id)
             msg = f"File {file_name} not found in flow {flow_id}"
-            raise FileNotFoundError(msg)
-
-        async with async_open(str(file_path), "rb") as f:
-            content = await f.read()
+            raise FileNotFoundError(msg) from e
 
-        logger.debug(f"File {file_name} retrieved successfully from flow {flow_id}.")
+        logger.debug("File %s retrieved successfully from flow %s.", file_name, flow_id)
         return content
 
+    async def get_file_stream(
+        self, flow_id: str, file_name: str, chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """Retrieve a file from the local storage in chunks.
+
+        Args:
+            flow_id: The identifier for the flow.
+            file_name: The name of the file to be retrieved.
+            chunk_size: The maximum size of each chunk in bytes.
+
+        Yields:
+            The byte content of the file, one chunk at a time.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+        file_path = self.data_dir / flow_id / file_name
+        try:
+            f = await asyncio.to_thread(file_path.open, "rb")
+        except FileNotFoundError as e:
+            await logger.awarning("File %s not found in flow %s.", file_name, flow_id)
+            msg = f"File {file_name} not found in flow {flow_id}"
+            raise FileNotFoundError(msg) from e
+
+        try:
+            while chunk := await asyncio.to_thread(f.read, chunk_size):
+                yield chunk
+        finally:
+            f.close()
+
+    async def save_file_stream(self, flow_id: str, file_name: str, chunks: AsyncIterable[bytes]) -> None:
+        """Save a file in the local storage from an async iterable of chunks.
+
+        Args:
+            flow_id: The identifier for the flow.
+            file_name: The name of the file to be saved.
+            chunks: The byte content of the file, one chunk at a time.
+        """
+        folder_path = await self._ensure_folder(flow_id)
+        file_path = folder_path / file_name
+
+        try:
+            try:
+                f = await asyncio.to_thread(file_path.open, "wb")
+            except FileNotFoundError:
+                # The cached folder may have been removed since (e.g. by the orphaned flow cleanup)
+                await asyncio.to_thread(folder_path.mkdir, parents=True, exist_ok=True)
+                f = await asyncio.to_thread(file_path.open, "wb")
+            try:
+                async for chunk in chunks:
+                    await asyncio.to_thread(f.write, chunk)
+            finally:
+                await asyncio.to_thread(f.close)
+            await logger.ainfo("File %s saved successfully in flow %s.", file_name, flow_id)
+        except Exception:
+            logger.exception("Error saving file %s in flow %s", file_name, flow_id)
+            raise
+        finally:
+            self._invalidate_file_size(flow_id, file_name)
+
+    async def send_file(self, flow_id: str, file_name: str, out_fd: int) -> int:
+        """Copy a file from the local storage to a file descriptor with os.sendfile.
+
+        The data is transferred by the kernel without being read into Python, so this
+        is the cheapest way to hand a stored file to a socket. Where os.sendfile is not
+        available (Windows) the file is copied in chunks with os.write instead. The
+        descriptor must be in blocking mode.
+
+        Args:
+            flow_id: The identifier for the flow.
+            file_name: The name of the file to be sent.
+            out_fd: The file descriptor (usually a socket) to write the file to.
+
+        Returns:
+            The number of bytes sent.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+        file_path = self.data_dir / flow_id / file_name
+        try:
+            return await asyncio.to_thread(_send_file, str(file_path), out_fd)
+        except FileNotFoundError as e:
+            await logger.awarning("File %s not found in flow %s.", file_name, flow_id)
+            msg = f"File {file_name} not found in flow {flow_id}"
+            raise FileNotFoundError(msg) from e
+
     async def list_files(self, flow_id: str):
         """List all files in a specified flow.
 
@@ -82,18 +241,14 @@ class LocalStorageService(StorageService):
         if not isinstance(flow_id, str):
             flow_id = str(flow_id)
         folder_path = self.data_dir / flow_id
-        if not await folder_path.exists() or not await folder_path.is_dir():
-            await logger.awarning(f"Flow {flow_id} directory does not exist.")
+        try:
+            files = await asyncio.to_thread(_list_file_names, str(folder_path))
+        except (FileNotFoundError, NotADirectoryError) as e:
+            await logger.awarning("Flow %s directory does not exist.", flow_id)
             msg = f"Flow {flow_id} directory does not exist."
-            raise FileNotFoundError(msg)
-
-        files = [
-            file.name
-            async for file in await anyio.to_thread.run_sync(folder_path.iterdir)
-            if await anyio.Path(file).is_file()
-        ]
+            raise FileNotFoundError(msg) from e
 
-        await logger.ainfo(f"Listed {len(files)} files in flow {flow_id}.")
+        await logger.ainfo("Listed %s files in flow %s.", len(files), flow_id)
         return files
 
     async def delete_file(self, flow_id: str, file_name: str) -> None:
@@ -103,24 +258,43 @@ class LocalStorageService(StorageService):
         :param file_name: The name of the file to be deleted.
         """
         file_path = self.data_dir / flow_id / file_name
-        if await file_path.exists():
-            await file_path.unlink()
-            await logger.ainfo(f"File {file_name} deleted successfully from flow {flow_id}.")
+        try:
+            await asyncio.to_thread(file_path.unlink)
+        except FileNotFoundError:
+            await logger.awarning("Attempted to delete non-existent file %s in flow %s.", file_name, flow_id)
         else:
-            await logger.awarning(f"Attempted to delete non-existent file {file_name} in flow {flow_id}.")
+            await logger.ainfo("File %s deleted successfully from flow %s.", file_name, flow_id)
+        finally:
+            self._invalidate_file_size(flow_id, file_name)
+
+    async def delete_files(self, flow_id: str, file_names: list[str]) -> None:
+        """Delete several files of a flow from the local storage concurrently.
+
+        Args:
+            flow_id: The identifier for the flow.
+            file_names: The names of the files to be deleted.
+        """
+        await asyncio.gather(*(self.delete_file(flow_id, file_name) for file_name in file_names))
 
     async def teardown(self) -> None:
         """Perform any cleanup operations when the service is being torn down."""
-        # No specific teardown actions required for local
+        self._created_folders.clear()
 
     async def get_file_size(self, flow_id: str, file_name: str):
         """Get the size of a file in the local storage."""
+        cached_size = self._get_cached_file_size(flow_id, file_name)
+        if cached_size is not None:
+            return cached_size
+
+        cache_version = self._file_size_cache_version
         # Get the file size from the file path
         file_path = self.data_dir / flow_id / file_name
-        if not await file_path.exists():
-            await logger.awarning(f"File {file_name} not found in flow {flow_id}.")
+        try:
+            file_size_stat = await asyncio.to_thread(file_path.stat)
+        except FileNotFoundError as e:
+            await logger.awarning("File %s not found in flow %s.", file_name, flow_id)
             msg = f"File {file_name} not found in flow {flow_id}"
-            raise FileNotFoundError(msg)
+            raise FileNotFoundError(msg) from e
 
-        file_size_stat = await file_path.stat()
+        self._cache_file_size(flow_id, file_name, file_size_stat.st_size, cache_version)
         return file_size_stat.st_size
@@ -1,11 +1,37 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import io
 import os
+import zlib
+from typing import TYPE_CHECKING
 
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError, NoCredentialsError
+from lfx.log.logger import logger
+
+from .constants import COMPRESSIBLE_EXTENSIONS
+from .service import STREAM_CHUNK_SIZE, StorageService
 
-from langflow.logging.logger import logger
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterable, AsyncIterator
 
-from .service import StorageService
+# Payloads of at least this size are uploaded in parallel multipart chunks, smaller ones with put_object
+MULTIPART_CHUNK_SIZE = 8 * 1024 * 1024
+MULTIPART_MAX_CONCURRENCY = 10
+# Maximum number of keys accepted by a single DeleteObjects request
+DELETE_OBJECTS_BATCH_SIZE = 1000
+# botocore defaults to 10 pooled connections, which serializes concurrent requests
+MAX_POOL_CONNECTIONS = 64
+# Text files between these sizes are gzip-compressed before upload
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_MAX_SIZE = MULTIPART_CHUNK_SIZE
+COMPRESSION_LEVEL = 6
+# S3 lowercases user metadata keys, so this one is lowercase as well
+UNCOMPRESSED_SIZE_METADATA_KEY = "uncompressed-size"
 
 
 class S3StorageService(StorageService):
@@ -15,9 +41,41 @@ class S3StorageService(StorageService):
         """Initialize the S3 storage service with session and settings services."""
         super().__init__(session_service, settings_service)
         self.bucket = os.getenv("LANGFLOW_S3_BUCKET", "langflow")
-        self.s3_client = boto3.client("s3")
+        self._session = boto3.Session()
+        self.s3_client = self._session.client(
+            "s3",
+            config=Config(
+                max_pool_connections=MAX_POOL_CONNECTIONS,
+                tcp_keepalive=True,
+                retries={"max_attempts": 3, "mode": "adaptive"},
+            ),
+        )
+        self._transfer_config = TransferConfig(
+            multipart_threshold=MULTIPART_CHUNK_SIZE,
+            multipart_chunksize=MULTIPART_CHUNK_SIZE,
+            max_concurrency=MULTIPART_MAX_CONCURRENCY,
+            use_threads=True,
+        )
         self.set_ready()
 
+    @staticmethod
+    def _build_key(flow_id: str, file_name: str) -> str:
+        """Build the object key of a file in the S3 bucket.
+
+        Every S3 method derives its key here, so this is the single place where
+        the flow and file name arguments are validated.
+        """
+        if not flow_id or not file_name:
+            msg = "Both flow_id and file_name are required to build an S3 key."
+            raise ValueError(msg)
+        return f"{flow_id}/{file_name}"
+
+    @staticmethod
+    def _should_compress(file_name: str, data: bytes) -> bool:
+        """Whether a file is a small text payload that is worth gzip-compressing before upload."""
+        extension = file_name.rsplit(".", 1)[-1].lower()
+        return extension in COMPRESSIBLE_EXTENSIONS and COMPRESSION_MIN_SIZE <= len(data) <= COMPRESSION_MAX_SIZE
+
     async def save_file(self, flow_id: str, file_name: str, data) -> None:
         """Save a file to the S3 bucket.
 
@@ -29,15 +87,40 @@ class S3StorageService(StorageService):
         Raises:
             Exception: If an error occurs during file saving.
         """
+        extra_args = None
+        if self._should_compress(file_name, data):
+            compressed = await asyncio.to_thread(gzip.compress, data, compresslevel=COMPRESSION_LEVEL, mtime=0)
+            if len(compressed) < len(data):
+                extra_args = {
+                    "ContentEncoding": "gzip",
+                    "Metadata": {UNCOMPRESSED_SIZE_METADATA_KEY: str(len(data))},
+                }
+                data = compressed
+        key = self._build_key(flow_id, file_name)
         try:
-            self.s3_client.put_object(Bucket=self.bucket, Key=f"{flow_id}/{file_name}", Body=data)
-            await logger.ainfo(f"File {file_name} saved successfully in folder {flow_id}.")
+            if len(data) < MULTIPART_CHUNK_SIZE:
+                # A single request is cheaper than spinning up the transfer manager for small files
+                await asyncio.to_thread(
+                    self.s3_client.put_object, Bucket=self.bucket, Key=key, Body=data, **(extra_args or {})
+                )
+            else:
+                await asyncio.to_thread(
+                    self.s3_client.upload_fileobj,
+                    io.BytesIO(data),
+                    self.bucket,
+                    key,
+                    ExtraArgs=extra_args,
+                    Config=self._transfer_config,
+                )
+            await logger.ainfo("File %s saved successfully in folder %s.", file_name, flow_id)
         except NoCredentialsError:
             await logger.aexception("Credentials not available for AWS S3.")
             raise
         except ClientError:
-            await logger.aexception(f"Error saving file {file_name} in folder {flow_id}")
+            await logger.aexception("Error saving file %s in folder %s", file_name, flow_id)
             raise
+        finally:
+            self._invalidate_file_size(flow_id, file_name)
 
     async def get_file(self, flow_id: str, file_name: str):
         """Retrieve a file from the S3 bucket.
@@ -53,12 +136,122 @@ class S3StorageService(StorageService):
             Exception: If an error occurs during file retrieval.
         """
         try:
-            response = self.s3_client.get_object(Bucket=self.bucket, Key=f"{flow_id}/{file_name}")
-            await logger.ainfo(f"File {file_name} retrieved successfully from folder {flow_id}.")
-            return response["Body"].read()
+            response = await asyncio.to_thread(
+                self.s3_client.get_object, Bucket=self.bucket, Key=self._build_key(flow_id, file_name)
+            )
+            content = await asyncio.to_thread(response["Body"].read)
+            if response.get("ContentEncoding") == "gzip":
+                content = await asyncio.to_thread(gzip.decompress, content)
+        except ClientError:
+            await logger.aexception("Error retrieving file %s from folder %s", file_name, flow_id)
+            raise
+        else:
+            await logger.ainfo("File %s retrieved successfully from folder %s.", file_name, flow_id)
+            return content
+
+    async def get_file_stream(
+        self, flow_id: str, file_name: str, chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """Retrieve a file from the S3 bucket in chunks.
+
+        Args:
+            flow_id: The folder in the bucket where the file is stored.
+            file_name: The name of the file to be retrieved.
+            chunk_size: The maximum size of each chunk in bytes.
+
+        Yields:
+            The byte content of the file, one chunk at a time.
+
+        Raises:
+            Exception: If an error occurs during file retrieval.
+        """
+        try:
+            response = await asyncio.to_thread(
+                self.s3_client.get_object, Bucket=self.bucket, Key=self._build_key(flow_id, file_name)
+            )
         except ClientError:
-            await logger.aexception(f"Error retrieving file {file_name} from folder {flow_id}")
+            await logger.aexception("Error retrieving file %s from folder %s", file_name, flow_id)
+            raise
+
+        body = response["Body"]
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if response.get("ContentEncoding") == "gzip" else None
+        try:
+            while chunk := await asyncio.to_thread(body.read, chunk_size):
+                if decompressor is not None:
+                    chunk = decompressor.decompress(chunk)
+                if chunk:
+                    yield chunk
+            if decompressor is not None and (tail := decompressor.flush()):
+                yield tail
+        finally:
+            body.close()
+
+    async def save_file_stream(self, flow_id: str, file_name: str, chunks: AsyncIterable[bytes]) -> None:
+        """Save a file to the S3 bucket from an async iterable of chunks.
+
+        Chunks are buffered into parts of MULTIPART_CHUNK_SIZE bytes and sent with a
+        multipart upload, so at most one part is held in memory at a time. Files
+        smaller than a single part are uploaded with a plain put_object.
+
+        Args:
+            flow_id: The folder in the bucket to save the file.
+            file_name: The name of the file to be saved.
+            chunks: The byte content of the file, one chunk at a time.
+
+        Raises:
+            Exception: If an error occurs during file saving.
+        """
+        key = self._build_key(flow_id, file_name)
+        buffer = bytearray()
+        upload_id: str | None = None
+        parts: list[dict] = []
+
+        async def _upload_part(body: bytes) -> None:
+            part_number = len(parts) + 1
+            response = await asyncio.to_thread(
+                self.s3_client.upload_part,
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=body,
+            )
+            parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+
+        try:
+            async for chunk in chunks:
+                buffer += chunk
+                while len(buffer) >= MULTIPART_CHUNK_SIZE:
+                    if upload_id is None:
+                        upload = await asyncio.to_thread(
+                            self.s3_client.create_multipart_upload, Bucket=self.bucket, Key=key
+                        )
+                        upload_id = upload["UploadId"]
+                    await _upload_part(bytes(buffer[:MULTIPART_CHUNK_SIZE]))
+                    del buffer[:MULTIPART_CHUNK_SIZE]
+
+            if upload_id is None:
+                await asyncio.to_thread(self.s3_client.put_object, Bucket=self.bucket, Key=key, Body=bytes(buffer))
+            else:
+                if buffer:
+                    await _upload_part(bytes(buffer))
+                await asyncio.to_thread(
+                    self.s3_client.complete_multipart_upload,
+                    Bucket=self.bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                    MultipartUpload={"Parts": parts},
+                )
+            await logger.ainfo("File %s saved successfully in folder %s.", file_name, flow_id)
+        except Exception:
+            if upload_id is not None:
+                await asyncio.to_thread(
+                    self.s3_client.abort_multipart_upload, Bucket=self.bucket, Key=key, UploadId=upload_id
+                )
+            await logger.aexception("Error saving file %s in folder %s", file_name, flow_id)
             raise
+        finally:
+            self._invalidate_file_size(flow_id, file_name)
 
     async def list_files(self, flow_id: str):
         """List all files in a specified folder of the S3 bucket.
@@ -72,14 +265,22 @@ class S3StorageService(StorageService):
         Raises:
             Exception: If an error occurs during file listing.
         """
+        prefix = f"{flow_id}/"
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+
+        def _list_keys() -> list[str]:
+            # With a delimiter, S3 reports nested "folders" under CommonPrefixes,
+            # so Contents only holds the files directly under the prefix.
+            pages = paginator.paginate(Bucket=self.bucket, Prefix=prefix, Delimiter="/")
+            return [item["Key"][len(prefix) :] for page in pages for item in page.get("Contents", [])]
+
         try:
-            response = self.s3_client.list_objects_v2(Bucket=self.bucket, Prefix=str(flow_id))
+            files = await asyncio.to_thread(_list_keys)
         except ClientError:
-            await logger.aexception(f"Error listing files in folder {flow_id}")
+            await logger.aexception("Error listing files in folder %s", flow_id)
             raise
 
-        files = [item["Key"] for item in response.get("Contents", []) if "/" not in item["Key"][len(flow_id) :]]
-        await logger.ainfo(f"{len(files)} files listed in folder {flow_id}.")
+        await logger.ainfo("%s files listed in folder %s.", len(files), flow_id)
         return files
 
     async def delete_file(self, flow_id: str, file_name: str) -> None:
@@ -93,11 +294,49 @@ class S3StorageService(StorageService):
             Exception: If an error occurs during file deletion.
         """
         try:
-            self.s3_client.delete_object(Bucket=self.bucket, Key=f"{flow_id}/{file_name}")
-            await logger.ainfo(f"File {file_name} deleted successfully from folder {flow_id}.")
+            await asyncio.to_thread(
+                self.s3_client.delete_object, Bucket=self.bucket, Key=self._build_key(flow_id, file_name)
+            )
+            await logger.ainfo("File %s deleted successfully from folder %s.", file_name, flow_id)
         except ClientError:
-            await logger.aexception(f"Error deleting file {file_name} from folder {flow_id}")
+            await logger.aexception("Error deleting file %s from folder %s", file_name, flow_id)
             raise
+        finally:
+            self._invalidate_file_size(flow_id, file_name)
+
+    async def delete_files(self, flow_id: str, file_names: list[str]) -> None:
+        """Delete several files from the S3 bucket using batched DeleteObjects requests.
+
+        Args:
+            flow_id: The folder in the bucket where the files are stored.
+            file_names: The names of the files to be deleted.
+
+        Raises:
+            Exception: If an error occurs during file deletion.
+        """
+        for start in range(0, len(file_names), DELETE_OBJECTS_BATCH_SIZE):
+            batch = file_names[start : start + DELETE_OBJECTS_BATCH_SIZE]
+            objects = [{"Key": self._build_key(flow_id, file_name)} for file_name in batch]
+            try:
+                response = await asyncio.to_thread(
+                    self.s3_client.delete_objects,
+                    Bucket=self.bucket,
+                    Delete={"Objects": objects, "Quiet": True},
+                )
+            except ClientError:
+                await logger.aexception("Error deleting %s files from folder %s", len(batch), flow_id)
+                raise
+            finally:
+                for file_name in batch:
+                    self._invalidate_file_size(flow_id, file_name)
+
+            if errors := response.get("Errors"):
+                failed_keys = ", ".join(error["Key"] for error in errors)
+                msg = f"Error deleting files from folder {flow_id}: {failed_keys}"
+                await logger.aerror(msg)
+                raise RuntimeError(msg)
+
+        await logger.ainfo("%s files deleted successfully from folder %s.", len(file_names), flow_id)
 
     async def teardown(self) -> None:
         """Perform any cleanup operations when the service is being torn down."""
@@ -105,10 +344,22 @@ class S3StorageService(StorageService):
 
     async def get_file_size(self, flow_id: str, file_name: str):
         """Get the size of a file in the S3 bucket."""
+        cached_size = self._get_cached_file_size(flow_id, file_name)
+        if cached_size is not None:
+            return cached_size
+
+        cache_version = self._file_size_cache_version
         try:
-            response = self.s3_client.head_object(Bucket=self.bucket, Key=f"{flow_id}/{file_name}")
-            await logger.ainfo(f"File {file_name} retrieved successfully from folder {flow_id}.")
-            return response["ContentLength"]
+            response = await asyncio.to_thread(
+                self.s3_client.head_object, Bucket=self.bucket, Key=self._build_key(flow_id, file_name)
+            )
         except ClientError:
-            logger.aexception(f"Error getting file size for {file_name} in flow_id {flow_id}")
+            await logger.aexception("Error getting file size for %s in flow_id %s", file_name, flow_id)
             raise
+        else:
+            await logger.ainfo("File %s retrieved successfully from folder %s.", file_name, flow_id)
+            # Compressed objects report their stored size, so prefer the original one
+            metadata = response.get("Metadata", {})
+            file_size = int(metadata.get(UNCOMPRESSED_SIZE_METADATA_KEY, response["ContentLength"]))
+            self._cache_file_size(flow_id, file_name, file_size, cache_version)
+            return file_size
@@ -1,17 +1,26 @@
 from __future__ import annotations
 
+import asyncio
+import time
 from abc import abstractmethod
+from collections import OrderedDict
+from pathlib import Path
 from typing import TYPE_CHECKING
 
-import anyio
-
 from langflow.services.base import Service
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterable, AsyncIterator
+
     from lfx.services.settings.service import SettingsService
 
     from langflow.services.session.service import SessionService
 
+FILE_SIZE_CACHE_MAX_ENTRIES = 1024
+FILE_SIZE_CACHE_TTL_SECONDS = 5.0
+STREAM_CHUNK_SIZE = 1024 * 1024
+GET_FILES_MAX_CONCURRENCY = 8
+
 
 class StorageService(Service):
     name = "storage_service"
@@ -19,7 +28,14 @@ class StorageService(Service):
     def __init__(self, session_service: SessionService, settings_service: SettingsService):
         self.settings_service = settings_service
         self.session_service = session_service
-        self.data_dir: anyio.Path = anyio.Path(settings_service.settings.config_dir)
+        self.data_dir: Path = Path(settings_service.settings.config_dir)
+        # (flow_id, file_name) -> (expires_at, size), ordered from least to most recently used.
+        # The cache is per process: writes made by other workers never invalidate it, so it may
+        # report a size up to FILE_SIZE_CACHE_TTL_SECONDS old. Callers that need the exact size of
+        # the bytes they are about to send must take it from the opened file instead.
+        self._file_size_cache: OrderedDict[tuple[str, str], tuple[float, int]] = OrderedDict()
+        # Bumped on every invalidation, so a size fetched while a write was in flight is not cached
+        self._file_size_cache_version = 0
         self.set_ready()
 
     def build_full_path(self, flow_id: str, file_name: str) -> str:
@@ -28,6 +44,33 @@ class StorageService(Service):
     def set_ready(self) -> None:
         self.ready = True
 
+    def _get_cached_file_size(self, flow_id: str, file_name: str) -> int | None:
+        key = (flow_id, file_name)
+        entry = self._file_size_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, size = entry
+        if expires_at < time.monotonic():
+            del self._file_size_cache[key]
+            return None
+        self._file_size_cache.move_to_end(key)
+        return size
+
+    def _cache_file_size(self, flow_id: str, file_name: str, size: int, version: int) -> None:
+        if version != self._file_size_cache_version:
+            # A write or delete finished while the size was being fetched, so it may already be stale
+            return
+        key = (flow_id, file_name)
+        self._file_size_cache[key] = (time.monotonic() + FILE_SIZE_CACHE_TTL_SECONDS, size)
+        self._file_size_cache.move_to_end(key)
+        if len(self._file_size_cache) > FILE_SIZE_CACHE_MAX_ENTRIES:
+            self._file_size_cache.popitem(last=False)
+
+    def _invalidate_file_size(self, flow_id: str, file_name: str) -> None:
+        """Drop the cached size of a file. Call it after the write or delete has completed."""
+        self._file_size_cache.pop((flow_id, file_name), None)
+        self._file_size_cache_version += 1
+
     @abstractmethod
     async def save_file(self, flow_id: str, file_name: str, data) -> None:
         raise NotImplementedError
@@ -36,6 +79,30 @@ class StorageService(Service):
     async def get_file(self, flow_id: str, file_name: str) -> bytes:
         raise NotImplementedError
 
+    async def get_files(self, flow_id: str, file_names: list[str]) -> list[bytes]:
+        """Retrieve several files of a flow concurrently, in the order of file_names.
+
+        At most GET_FILES_MAX_CONCURRENCY reads are in flight at once. Every file is still held
+        in memory until all of them are read, so prefer get_file in a loop for large batches.
+        """
+        semaphore = asyncio.Semaphore(GET_FILES_MAX_CONCURRENCY)
+
+        async def _get_file(file_name: str) -> bytes:
+            async with semaphore:
+                return await self.get_file(flow_id, file_name)
+
+        return await asyncio.gather(*(_get_file(file_name) for file_name in file_names))
+
+    @abstractmethod
+    def get_file_stream(
+        self, flow_id: str, file_name: str, chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def save_file_stream(self, flow_id: str, file_name: str, chunks: AsyncIterable[bytes]) -> None:
+        raise NotImplementedError
+
     @abstractmethod
     async def list_files(self, flow_id: str) -> list[str]:
         raise NotImplementedError
@@ -48,5 +115,9 @@ class StorageService(Service):
     async def delete_file(self, flow_id: str, file_name: str) -> None:
         raise NotImplementedError
 
+    @abstractmethod
+    async def delete_files(self, flow_id: str, file_names: list[str]) -> None:
+        raise NotImplementedError
+
     async def teardown(self) -> None:
         raise NotImplementedError
@@ -58,8 +58,8 @@ async def cleanup_orphaned_records() -> None:
                                     logger.error(f"Failed to delete file {file} for flow {flow_id}: {exc!s}")
                             # Delete the flow directory after all files are deleted
                             flow_dir = storage_service.data_dir / str(flow_id)
-                            if await flow_dir.exists():
-                                await flow_dir.rmdir()
+                            with contextlib.suppress(FileNotFoundError):
+                                await asyncio.to_thread(flow_dir.rmdir)
                         except Exception as exc:  # noqa: BLE001
                             logger.error(f"Failed to list files for flow {flow_id}: {exc!s}")
 
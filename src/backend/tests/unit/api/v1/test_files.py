@@ -185,6 +185,14 @@ async def test_download_file(files_client, files_created_api_key, files_flow):
     assert response.content == b"test content"
 
 
+async def test_download_missing_file_returns_error(files_client, files_created_api_key, files_flow):
+    headers = {"x-api-key": files_created_api_key.api_key}
+
+    response = await files_client.get(f"api/v1/files/download/{files_flow.id}/missing.txt", headers=headers)
+    assert response.status_code == 500
+    assert "missing.txt" in response.json()["detail"]
+
+
 async def test_list_files(files_client, files_created_api_key, files_flow):
     headers = {"x-api-key": files_created_api_key.api_key}
 
@@ -0,0 +1,109 @@
+import asyncio
+import os
+import socket
+from types import SimpleNamespace
+
+import pytest
+from langflow.services.storage.local import LocalStorageService
+from langflow.services.storage.service import GET_FILES_MAX_CONCURRENCY
+
+FLOW_ID = "flow"
+
+
+@pytest.fixture
+def local_service(tmp_path):
+    settings_service = SimpleNamespace(settings=SimpleNamespace(config_dir=str(tmp_path)))
+    return LocalStorageService(session_service=None, settings_service=settings_service)
+
+
+async def test_save_file_recreates_removed_flow_folder(local_service, tmp_path):
+    await local_service.save_file(FLOW_ID, "first.txt", b"first")
+    (tmp_path / FLOW_ID / "first.txt").unlink()
+    (tmp_path / FLOW_ID).rmdir()
+
+    await local_service.save_file(FLOW_ID, "second.txt", b"second")
+
+    assert (tmp_path / FLOW_ID / "second.txt").read_bytes() == b"second"
+
+
+async def test_get_file_size_is_refreshed_after_save(local_service):
+    await local_service.save_file(FLOW_ID, "data.txt", b"short")
+    assert await local_service.get_file_size(FLOW_ID, "data.txt") == len(b"short")
+
+    await local_service.save_file(FLOW_ID, "data.txt", b"much longer content")
+
+    assert await local_service.get_file_size(FLOW_ID, "data.txt") == len(b"much longer content")
+
+
+async def test_delete_files_skips_missing_files(local_service, tmp_path):
+    await local_service.save_file(FLOW_ID, "a.txt", b"a")
+    await local_service.save_file(FLOW_ID, "b.txt", b"b")
+
+    await local_service.delete_files(FLOW_ID, ["a.txt", "missing.txt", "b.txt"])
+
+    assert list((tmp_path / FLOW_ID).iterdir()) == []
+
+
+async def test_file_stream_round_trip_in_chunks(local_service, tmp_path):
+    async def chunks():
+        yield b"abc"
+        yield b"defg"
+
+    await local_service.save_file_stream(FLOW_ID, "data.bin", chunks())
+
+    assert (tmp_path / FLOW_ID / "data.bin").read_bytes() == b"abcdefg"
+    streamed = [chunk async for chunk in local_service.get_file_stream(FLOW_ID, "data.bin", chunk_size=3)]
+    assert streamed == [b"abc", b"def", b"g"]
+
+
+async def test_get_file_stream_raises_for_missing_file(local_service):
+    with pytest.raises(FileNotFoundError):
+        await anext(local_service.get_file_stream(FLOW_ID, "missing.bin"))
+
+
+async def test_get_files_bounds_concurrency_and_keeps_order(local_service, monkeypatch):
+    in_flight = 0
+    max_in_flight = 0
+
+    async def get_file(flow_id, file_name):  # noqa: ARG001
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        return file_name.encode()
+
+    monkeypatch.setattr(local_service, "get_file", get_file)
+    file_names = [f"{i}.txt" for i in range(GET_FILES_MAX_CONCURRENCY * 3)]
+
+    contents = await local_service.get_files(FLOW_ID, file_names)
+
+    assert contents == [file_name.encode() for file_name in file_names]
+    assert max_in_flight == GET_FILES_MAX_CONCURRENCY
+
+
+def _read_all(sock: socket.socket) -> bytes:
+    received = bytearray()
+    while chunk := sock.recv(65536):
+        received += chunk
+    return bytes(received)
+
+
+@pytest.mark.parametrize("has_sendfile", [True, False])
+async def test_send_file_writes_whole_file_to_socket(local_service, monkeypatch, has_sendfile):
+    if not has_sendfile:
+        monkeypatch.delattr(os, "sendfile", raising=False)
+    elif not hasattr(os, "sendfile"):
+        pytest.skip("os.sendfile is not available on this platform")
+    data = os.urandom(3 * 1024 * 1024 + 7)
+    await local_service.save_file(FLOW_ID, "data.bin", data)
+
+    sender, receiver = socket.socketpair()
+    with sender, receiver:
+        reader = asyncio.create_task(asyncio.to_thread(_read_all, receiver))
+        sent = await local_service.send_file(FLOW_ID, "data.bin", sender.fileno())
+        sender.shutdown(socket.SHUT_WR)
+        received = await reader
+
+    assert sent == len(data)
+    assert received == data
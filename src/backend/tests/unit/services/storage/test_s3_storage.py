@@ -0,0 +1,185 @@
+import gzip
+import io
+from types import SimpleNamespace
+
+import pytest
+from botocore.exceptions import ClientError
+from botocore.response import StreamingBody
+from botocore.stub import ANY, Stubber
+from langflow.services.storage import s3
+from langflow.services.storage.s3 import S3StorageService
+
+BUCKET = "test-bucket"
+FLOW_ID = "flow"
+
+
+@pytest.fixture
+def s3_service(monkeypatch, tmp_path):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setenv("LANGFLOW_S3_BUCKET", BUCKET)
+    settings_service = SimpleNamespace(settings=SimpleNamespace(config_dir=str(tmp_path)))
+    return S3StorageService(session_service=None, settings_service=settings_service)
+
+
+@pytest.fixture
+def stubber(s3_service):
+    with Stubber(s3_service.s3_client) as stubber:
+        yield stubber
+        stubber.assert_no_pending_responses()
+
+
+async def test_list_files_reads_every_page_and_skips_nested_keys(s3_service, stubber):
+    expected_params = {"Bucket": BUCKET, "Prefix": f"{FLOW_ID}/", "Delimiter": "/"}
+    stubber.add_response(
+        "list_objects_v2",
+        {
+            "Contents": [{"Key": f"{FLOW_ID}/a.txt"}, {"Key": f"{FLOW_ID}/b.json"}],
+            "CommonPrefixes": [{"Prefix": f"{FLOW_ID}/nested/"}],
+            "IsTruncated": True,
+            "NextContinuationToken": "page-2",
+        },
+        expected_params,
+    )
+    stubber.add_response(
+        "list_objects_v2",
+        {"Contents": [{"Key": f"{FLOW_ID}/c.csv"}], "IsTruncated": False},
+        {**expected_params, "ContinuationToken": "page-2"},
+    )
+
+    files = await s3_service.list_files(FLOW_ID)
+
+    assert files == ["a.txt", "b.json", "c.csv"]
+
+
+async def test_delete_files_batches_delete_objects_requests(s3_service, stubber):
+    file_names = [f"file-{i}.txt" for i in range(1001)]
+    keys = [{"Key": f"{FLOW_ID}/{file_name}"} for file_name in file_names]
+    stubber.add_response("delete_objects", {}, {"Bucket": BUCKET, "Delete": {"Objects": keys[:1000], "Quiet": True}})
+    stubber.add_response("delete_objects", {}, {"Bucket": BUCKET, "Delete": {"Objects": keys[1000:], "Quiet": True}})
+
+    await s3_service.delete_files(FLOW_ID, file_names)
+
+
+async def test_delete_files_raises_on_reported_errors(s3_service, stubber):
+    stubber.add_response(
+        "delete_objects",
+        {"Errors": [{"Key": f"{FLOW_ID}/b.txt", "Code": "AccessDenied", "Message": "Access Denied"}]},
+        {
+            "Bucket": BUCKET,
+            "Delete": {"Objects": [{"Key": f"{FLOW_ID}/a.txt"}, {"Key": f"{FLOW_ID}/b.txt"}], "Quiet": True},
+        },
+    )
+
+    with pytest.raises(RuntimeError, match=f"{FLOW_ID}/b.txt"):
+        await s3_service.delete_files(FLOW_ID, ["a.txt", "b.txt"])
+
+
+async def _chunks(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+async def test_save_file_stream_uses_multipart_upload_for_large_files(s3_service, stubber, monkeypatch):
+    monkeypatch.setattr(s3, "MULTIPART_CHUNK_SIZE", 4)
+    key = f"{FLOW_ID}/big.bin"
+    stubber.add_response("create_multipart_upload", {"UploadId": "upload-1"}, {"Bucket": BUCKET, "Key": key})
+    for part_number, etag in ((1, "etag-1"), (2, "etag-2")):
+        stubber.add_response(
+            "upload_part",
+            {"ETag": etag},
+            {"Bucket": BUCKET, "Key": key, "UploadId": "upload-1", "PartNumber": part_number, "Body": ANY},
+        )
+    stubber.add_response(
+        "complete_multipart_upload",
+        {},
+        {
+            "Bucket": BUCKET,
+            "Key": key,
+            "UploadId": "upload-1",
+            "MultipartUpload": {"Parts": [{"ETag": "etag-1", "PartNumber": 1}, {"ETag": "etag-2", "PartNumber": 2}]},
+        },
+    )
+
+    await s3_service.save_file_stream(FLOW_ID, "big.bin", _chunks(b"abc", b"def", b"g"))
+
+
+async def test_save_file_stream_uses_put_object_below_one_part(s3_service, stubber):
+    stubber.add_response("put_object", {}, {"Bucket": BUCKET, "Key": f"{FLOW_ID}/small.bin", "Body": b"abcdef"})
+
+    await s3_service.save_file_stream(FLOW_ID, "small.bin", _chunks(b"abc", b"def"))
+
+
+async def test_save_file_stream_aborts_multipart_upload_on_error(s3_service, stubber, monkeypatch):
+    monkeypatch.setattr(s3, "MULTIPART_CHUNK_SIZE", 4)
+    key = f"{FLOW_ID}/big.bin"
+    stubber.add_response("create_multipart_upload", {"UploadId": "upload-1"}, {"Bucket": BUCKET, "Key": key})
+    stubber.add_client_error("upload_part", service_error_code="InternalError", http_status_code=500)
+    stubber.add_response("abort_multipart_upload", {}, {"Bucket": BUCKET, "Key": key, "UploadId": "upload-1"})
+
+    with pytest.raises(ClientError):
+        await s3_service.save_file_stream(FLOW_ID, "big.bin", _chunks(b"abcdef"))
+
+
+def _get_object_response(body: bytes, **extra) -> dict:
+    return {"Body": StreamingBody(io.BytesIO(body), len(body)), "ContentLength": len(body), **extra}
+
+
+async def test_compressible_file_round_trip(s3_service, stubber):
+    data = b'{"key": "value"}\n' * 200
+    compressed = gzip.compress(data, compresslevel=s3.COMPRESSION_LEVEL, mtime=0)
+    key = f"{FLOW_ID}/data.json"
+    stubber.add_response(
+        "put_object",
+        {},
+        {
+            "Bucket": BUCKET,
+            "Key": key,
+            "Body": compressed,
+            "ContentEncoding": "gzip",
+            "Metadata": {s3.UNCOMPRESSED_SIZE_METADATA_KEY: str(len(data))},
+        },
+    )
+    stubber.add_response(
+        "get_object", _get_object_response(compressed, ContentEncoding="gzip"), {"Bucket": BUCKET, "Key": key}
+    )
+    stubber.add_response(
+        "get_object", _get_object_response(compressed, ContentEncoding="gzip"), {"Bucket": BUCKET, "Key": key}
+    )
+    stubber.add_response(
+        "head_object",
+        {
+            "ContentLength": len(compressed),
+            "ContentEncoding": "gzip",
+            "Metadata": {s3.UNCOMPRESSED_SIZE_METADATA_KEY: str(len(data))},
+        },
+        {"Bucket": BUCKET, "Key": key},
+    )
+
+    await s3_service.save_file(FLOW_ID, "data.json", data)
+
+    assert await s3_service.get_file(FLOW_ID, "data.json") == data
+    streamed = [chunk async for chunk in s3_service.get_file_stream(FLOW_ID, "data.json", chunk_size=64)]
+    assert b"".join(streamed) == data
+    assert await s3_service.get_file_size(FLOW_ID, "data.json") == len(data)
+
+
+async def test_uncompressed_objects_are_read_unchanged(s3_service, stubber):
+    data = b"legacy object stored before compression" * 50
+    key = f"{FLOW_ID}/legacy.txt"
+    stubber.add_response("get_object", _get_object_response(data), {"Bucket": BUCKET, "Key": key})
+    stubber.add_response("get_object", _get_object_response(data), {"Bucket": BUCKET, "Key": key})
+    stubber.add_response("head_object", {"ContentLength": len(data)}, {"Bucket": BUCKET, "Key": key})
+
+    assert await s3_service.get_file(FLOW_ID, "legacy.txt") == data
+    streamed = [chunk async for chunk in s3_service.get_file_stream(FLOW_ID, "legacy.txt", chunk_size=64)]
+    assert b"".join(streamed) == data
+    assert await s3_service.get_file_size(FLOW_ID, "legacy.txt") == len(data)
+
+
+async def test_binary_files_are_uploaded_without_compression(s3_service, stubber):
+    data = b"\x00" * 4096
+    stubber.add_response("put_object", {}, {"Bucket": BUCKET, "Key": f"{FLOW_ID}/data.bin", "Body": data})
+
+    await s3_service.save_file(FLOW_ID, "data.bin", data)
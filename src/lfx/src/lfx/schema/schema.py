@@ -3,9 +3,10 @@ from enum import Enum
 from typing import TYPE_CHECKING, Literal
 
 from pydantic import BaseModel, ConfigDict, Field
-from typing_extensions import TypedDict
 
 if TYPE_CHECKING:
+    from typing_extensions import TypedDict
+
     from lfx.custom.custom_component.component import Component
 
 INPUT_FIELD_NAME = "input_value"
@@ -14,7 +15,7 @@ InputType = Literal["chat", "text", "any"]
 OutputType = Literal["chat", "text", "any", "debug"]
 
 
-class LogType(str, Enum):
+class LogType(Enum):
     MESSAGE = "message"
     DATA = "data"
     STREAM = "stream"
@@ -24,19 +25,27 @@ class LogType(str, Enum):
     UNKNOWN = "unknown"
 
 
-class StreamURL(TypedDict):
-    location: str
+if TYPE_CHECKING:
+
+    class StreamURL(TypedDict):
+        location: str
 
+    class ErrorLog(TypedDict):
+        errorMessage: str
+        stackTrace: str
 
-class ErrorLog(TypedDict):
-    errorMessage: str
-    stackTrace: str
+else:
+    # Both only describe dict payloads for type checkers, so skip the TypedDict class creation at runtime
+    StreamURL = dict
+    ErrorLog = dict
 
 
 class OutputValue(BaseModel):
     message: ErrorLog | StreamURL | dict | list | str
     type: str
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
 
 def get_type(payload):
     # Importing here to avoid circular imports
@@ -123,7 +132,7 @@ def build_output_logs(vertex, result) -> dict:
                     message = message.to_dict(orient="records")
                 message = [serialize(item) for item in message]
         name = output.get("name", f"output_{index}")
-        outputs |= {name: OutputValue(message=message, type=type_).model_dump()}
+        outputs |= {name: OutputValue(message=message, type=type_.value).model_dump()}
 
     return outputs
 